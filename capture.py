@@ -0,0 +1,466 @@
+import headless  # Must come before the OpenGL imports, it picks the PyOpenGL platform
+from OpenGL.GL import *
+from OpenGL.GLUT import *
+from OpenGL.GLU import *
+import argparse
+import collections
+import concurrent.futures
+import ctypes
+import json
+import os
+import random
+import struct
+import zlib
+
+# Import from other modules
+import game_core
+from game_core import keyboardListener, specialKeyListener, mouseListener, setupCamera
+from game_objects import (
+    rings, obstacles, enemies, bullets, powerups, explosions,
+    init_game_objects, update_game
+)
+from headless import headless_context, init_headless_context
+from terrain import init_terrain, update_terrain, draw_terrain
+
+# Capture parameters
+CAPTURE_WIDTH = 1000                  # 1.25 aspect, same as the game's projection
+CAPTURE_HEIGHT = 800
+CAPTURE_WORKERS = 4
+CAPTURE_MAX_PENDING = 16              # Frames in flight before the reader waits on the workers
+PNG_COMPRESSION = 6
+
+# Session currently being recorded from live input
+recorded_session = {
+    'recording': False,
+    'seed': 0,
+    'events': []                      # [tick, listener name, key or button, state]
+}
+
+# ---------------------------------------------------------------------------
+# Session recording (live game)
+#
+# Only input events are stored while playing, so the live game pays for a
+# list append per key press and nothing per frame. Frames are produced later
+# by replaying the session offline.
+# ---------------------------------------------------------------------------
+
+def start_recording(seed=None):
+    """Start recording input for a later replay; call before init_game_objects()"""
+    if seed is None:
+        seed = random.randrange(1 << 30)
+    random.seed(seed)
+    recorded_session['recording'] = True
+    recorded_session['seed'] = seed
+    recorded_session['events'] = []
+
+def stop_recording(path):
+    """Stop recording and write the session to a JSON file"""
+    recorded_session['recording'] = False
+    with open(path, 'w') as f:
+        json.dump({
+            'seed': recorded_session['seed'],
+            'ticks': game_core.game_state['time'],
+            'events': recorded_session['events']
+        }, f)
+
+def record_event(listener, key, state=None):
+    """Store one input event against the current simulation tick"""
+    if recorded_session['recording']:
+        if isinstance(key, bytes):
+            key = key.decode('latin-1')
+        # Read through the module: restart_game() may have replaced the dict
+        recorded_session['events'].append([game_core.game_state['time'], listener, key, state])
+
+def recordingKeyboardListener(key, x, y):
+    """Keyboard listener that also records the key for replay"""
+    record_event('keyboard', key)
+    keyboardListener(key, x, y)
+
+def recordingSpecialKeyListener(key, x, y):
+    """Arrow key listener that also records the key for replay"""
+    record_event('special', key)
+    specialKeyListener(key, x, y)
+
+def recordingMouseListener(button, state, x, y):
+    """Mouse listener that also records the click for replay"""
+    record_event('mouse', button, state)
+    mouseListener(button, state, x, y)
+
+def replay_event(event):
+    """Feed a recorded event back through the normal input listeners"""
+    tick, listener, key, state = event
+    if listener == 'keyboard':
+        keyboardListener(key.encode('latin-1'), 0, 0)
+    elif listener == 'special':
+        specialKeyListener(key, 0, 0)
+    elif listener == 'mouse':
+        mouseListener(key, state, 0, 0)
+
+# ---------------------------------------------------------------------------
+# Frame encoding (worker threads)
+#
+# zlib releases the GIL, so a thread pool keeps compression off the thread
+# that owns the GL context without copying frames between processes.
+# ---------------------------------------------------------------------------
+
+def flip_rows(pixels, width, height):
+    """Convert bottom-up glReadPixels rows to top-down order"""
+    stride = width * 3
+    return b''.join(pixels[row * stride:(row + 1) * stride]
+                    for row in range(height - 1, -1, -1))
+
+def png_chunk(tag, data):
+    """Build one PNG chunk"""
+    return (struct.pack('>I', len(data)) + tag + data +
+            struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+def encode_png(pixels, width, height):
+    """Encode bottom-up RGB pixels as a PNG file"""
+    top_down = flip_rows(pixels, width, height)
+    stride = width * 3
+    # Filter type 0 (None) in front of every scanline
+    raw = b''.join(b'\x00' + top_down[row * stride:(row + 1) * stride]
+                   for row in range(height))
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' +
+            png_chunk(b'IHDR', header) +
+            png_chunk(b'IDAT', zlib.compress(raw, PNG_COMPRESSION)) +
+            png_chunk(b'IEND', b''))
+
+def write_png_frame(path, pixels, width, height):
+    """Worker task: encode and write one frame of an image sequence"""
+    with open(path, 'wb') as f:
+        f.write(encode_png(pixels, width, height))
+
+def encode_raw_frame(pixels, width, height):
+    """Worker task: prepare one frame for the raw RGB24 stream"""
+    return flip_rows(pixels, width, height)
+
+class FrameSink:
+    """Hands frames to a worker pool and writes them out in order"""
+
+    def __init__(self, output, fmt, width, height, workers=CAPTURE_WORKERS):
+        self.output = output
+        self.fmt = fmt
+        self.width = width
+        self.height = height
+        self.frame_count = 0
+        self.pending = collections.deque()
+        self.stream = None
+
+        if fmt == 'png':
+            os.makedirs(output, exist_ok=True)
+        elif fmt == 'raw':
+            # Play back with: ffmpeg -f rawvideo -pix_fmt rgb24 -s WxH -r 60 -i <file>
+            self.stream = open(output, 'wb')
+        else:
+            raise ValueError("Unknown capture format: %s" % fmt)
+
+        # Started last so a bad output path doesn't leave idle workers behind
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+    def submit(self, pixels):
+        """Queue one bottom-up RGB frame for encoding"""
+        if self.fmt == 'png':
+            path = os.path.join(self.output, 'frame_%06d.png' % self.frame_count)
+            future = self.pool.submit(write_png_frame, path, pixels, self.width, self.height)
+        else:
+            future = self.pool.submit(encode_raw_frame, pixels, self.width, self.height)
+        self.pending.append(future)
+        self.frame_count += 1
+
+        # Bound memory use if the workers fall behind the renderer
+        while len(self.pending) > CAPTURE_MAX_PENDING:
+            self.drain_one()
+
+    def drain_one(self):
+        """Wait for the oldest frame and write it if it goes to the stream"""
+        result = self.pending.popleft().result()
+        if self.stream is not None:
+            self.stream.write(result)
+
+    def close(self):
+        """Flush all pending frames and shut down the workers
+
+        If a worker failed, its error is raised after the workers and the
+        output stream have been shut down.
+        """
+        try:
+            while self.pending:
+                self.drain_one()
+        finally:
+            for future in self.pending:
+                future.cancel()
+            self.pending.clear()
+            self.pool.shutdown()
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+
+# ---------------------------------------------------------------------------
+# Offscreen rendering (GL thread)
+# ---------------------------------------------------------------------------
+
+class OffscreenTarget:
+    """Framebuffer object with two pixel-pack buffers for asynchronous readback"""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.frame_size = width * height * 3
+        self.reads = 0
+
+        self.fbo = glGenFramebuffers(1)
+        self.color_rb, self.depth_rb = glGenRenderbuffers(2)
+
+        glBindRenderbuffer(GL_RENDERBUFFER, self.color_rb)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.depth_rb)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, width, height)
+
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self.color_rb)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, self.depth_rb)
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError("Offscreen framebuffer is incomplete")
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+
+        self.pbos = glGenBuffers(2)
+        for pbo in self.pbos:
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, pbo)
+            glBufferData(GL_PIXEL_PACK_BUFFER, self.frame_size, None, GL_STREAM_READ)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+
+    def bind(self):
+        """Direct rendering into the offscreen framebuffer"""
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glViewport(0, 0, self.width, self.height)
+
+    def read(self):
+        """Start reading this frame and return the previous one (None on the first call)
+
+        The read into one buffer runs while the other buffer, filled a frame
+        earlier, is mapped and copied, so the CPU never waits on the frame the
+        GPU has just finished.
+        """
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        glReadBuffer(GL_COLOR_ATTACHMENT0)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self.pbos[self.reads % 2])
+        glReadPixels(0, 0, self.width, self.height, GL_RGB, GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        self.reads += 1
+
+        pixels = None
+        if self.reads > 1:
+            pixels = self.map_buffer(self.pbos[self.reads % 2])
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        return pixels
+
+    def flush(self):
+        """Return the last frame still sitting in a pixel-pack buffer"""
+        if self.reads == 0:
+            return None
+        pixels = self.map_buffer(self.pbos[(self.reads - 1) % 2])
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        return pixels
+
+    def map_buffer(self, pbo):
+        """Copy the contents of a pixel-pack buffer into a bytes object"""
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, pbo)
+        address = glMapBuffer(GL_PIXEL_PACK_BUFFER, GL_READ_ONLY)
+        pixels = ctypes.string_at(address, self.frame_size)
+        glUnmapBuffer(GL_PIXEL_PACK_BUFFER)
+        return pixels
+
+    def release(self):
+        """Delete the framebuffer, renderbuffers and pixel-pack buffers"""
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        glDeleteBuffers(2, self.pbos)
+        glDeleteRenderbuffers(2, [self.color_rb, self.depth_rb])
+        glDeleteFramebuffers(1, [self.fbo])
+
+# Quadric shared by the placeholder shapes (created once, not per frame)
+capture_quadric = None
+
+def draw_box(sx, sy, sz):
+    """Draw a solid box centred on the origin without GLUT"""
+    x, y, z = sx / 2, sy / 2, sz / 2
+    glBegin(GL_QUADS)
+    for normal, corners in (
+        ((0, 0, 1), ((-x, -y, z), (x, -y, z), (x, y, z), (-x, y, z))),
+        ((0, 0, -1), ((-x, -y, -z), (-x, y, -z), (x, y, -z), (x, -y, -z))),
+        ((1, 0, 0), ((x, -y, -z), (x, y, -z), (x, y, z), (x, -y, z))),
+        ((-1, 0, 0), ((-x, -y, -z), (-x, -y, z), (-x, y, z), (-x, y, -z))),
+        ((0, 1, 0), ((-x, y, -z), (-x, y, z), (x, y, z), (x, y, -z))),
+        ((0, -1, 0), ((-x, -y, -z), (x, -y, -z), (x, -y, z), (-x, -y, z)))
+    ):
+        glNormal3f(*normal)
+        for corner in corners:
+            glVertex3f(*corner)
+    glEnd()
+
+def draw_sphere(radius):
+    """Draw a sphere with the shared quadric"""
+    global capture_quadric
+    if capture_quadric is None:
+        capture_quadric = gluNewQuadric()
+    gluSphere(capture_quadric, radius, 12, 12)
+
+def draw_placeholder_airplane():
+    """Box version of draw_airplane for contexts without GLUT shapes"""
+    glPushMatrix()
+    airplane = game_core.airplane
+    glTranslatef(airplane['x'], airplane['y'], airplane['z'])
+    glRotatef(airplane['pitch'], 1, 0, 0)
+    glRotatef(airplane['roll'], 0, 1, 0)
+    glColor3f(0.7, 0.7, 0.7)
+    draw_box(30, 90, 15)              # Fuselage
+    glColor3f(0.8, 0.8, 0.8)
+    draw_box(150, 9, 6)               # Wings
+    glTranslatef(0, -35, 10)
+    glColor3f(0.6, 0.6, 0.6)
+    draw_box(6, 15, 45)               # Tail
+    glPopMatrix()
+
+def draw_enemy_placeholder():
+    """Fuselage and wings of an enemy plane"""
+    draw_box(20, 60, 10)
+    draw_box(90, 8, 4)
+
+def draw_at(entity, draw):
+    """Translate to an entity's position and draw it"""
+    glPushMatrix()
+    glTranslatef(entity['x'], entity['y'], entity['z'])
+    draw()
+    glPopMatrix()
+
+def draw_placeholder_entities():
+    """Draw obstacles, enemies, bullets, power-ups and explosions as simple shapes
+
+    graphics_main.py has no draw functions for these yet, so captured frames
+    use stand-in geometry sized like their collision radii.
+    """
+    for obs in obstacles:
+        if obs['type'] == 'cloud':
+            glColor3f(1, 1, 1)
+            draw_at(obs, lambda: draw_sphere(40))
+        elif obs['type'] == 'rock':
+            glColor3f(0.4, 0.35, 0.3)
+            draw_at(obs, lambda: draw_box(40, 40, 40))
+        else:
+            glColor3f(1, 0.2, 0.2)
+            draw_at(obs, lambda: draw_sphere(20))
+
+    glColor3f(0.8, 0.1, 0.1)
+    for enemy in enemies:
+        if enemy['active']:
+            draw_at(enemy, draw_enemy_placeholder)
+
+    glColor3f(1, 1, 0.3)
+    for bullet in bullets:
+        draw_at(bullet, lambda: draw_box(4, 12, 4))
+
+    glColor3f(0, 1, 1)
+    for powerup in powerups:
+        if not powerup['collected']:
+            draw_at(powerup, lambda: draw_box(20, 20, 20))
+
+    glColor3f(1, 0.5, 0)
+    for explosion in explosions:
+        radius = explosion['size'] + (30 - explosion['timer'])
+        draw_at(explosion, lambda: draw_sphere(radius))
+
+def draw_capture_scene():
+    """Draw one frame of the current game state for capture"""
+    from graphics_main import draw_airplane, draw_ring
+
+    glClearColor(0.5, 0.7, 1.0, 1.0)  # Sky blue
+    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+    glEnable(GL_DEPTH_TEST)
+
+    setupCamera()
+    draw_terrain()
+    for ring in rings:
+        draw_ring(ring)
+    draw_placeholder_entities()
+    # draw_airplane uses glutSolidCube, which needs a GLUT window
+    if headless_context['glut_available']:
+        draw_airplane()
+    else:
+        draw_placeholder_airplane()
+
+def capture_session(session, output, fmt='png', width=CAPTURE_WIDTH, height=CAPTURE_HEIGHT,
+                    frame_step=1):
+    """Replay a recorded session as fast as possible and capture every frame_step-th tick"""
+    init_headless_context(width, height)
+
+    random.seed(session['seed'])
+    init_game_objects()
+    init_terrain()
+
+    # Keep recorded order: tick numbers start again from 0 after a restart
+    events = collections.deque(session['events'])
+    target = OffscreenTarget(width, height)
+    try:
+        sink = FrameSink(output, fmt, width, height)
+        try:
+            capture_frames(events, session['ticks'], frame_step, target, sink)
+        finally:
+            sink.close()
+    finally:
+        target.release()
+
+    return sink.frame_count
+
+def capture_frames(events, ticks, frame_step, target, sink):
+    """Step the replay and hand every frame_step-th rendered frame to the sink"""
+    frame = 0
+    while events or game_core.game_state['time'] < ticks:
+        # Events recorded at this tick happened before the tick was simulated
+        while events and events[0][0] <= game_core.game_state['time']:
+            replay_event(events.popleft())
+        if game_core.game_state['game_over'] and not events:
+            break
+        update_game()
+        update_terrain()
+
+        frame += 1
+        if (frame - 1) % frame_step:
+            continue
+
+        target.bind()
+        draw_capture_scene()
+        pixels = target.read()
+        if pixels is not None:
+            sink.submit(pixels)
+
+    pixels = target.flush()
+    if pixels is not None:
+        sink.submit(pixels)
+
+def positive_int(value):
+    """argparse type for integers of at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1, got %s" % value)
+    return number
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a recorded 3D Aviator session offscreen")
+    parser.add_argument('session', help="Session JSON written by stop_recording()")
+    parser.add_argument('output', help="Directory for PNG frames, or file for raw RGB24 video")
+    parser.add_argument('--format', choices=['png', 'raw'], default='png')
+    parser.add_argument('--width', type=int, default=CAPTURE_WIDTH)
+    parser.add_argument('--height', type=int, default=CAPTURE_HEIGHT)
+    parser.add_argument('--frame-step', type=positive_int, default=1,
+                        help="Capture every Nth simulation tick")
+    args = parser.parse_args()
+
+    with open(args.session) as f:
+        session = json.load(f)
+
+    frames = capture_session(session, args.output, args.format,
+                             args.width, args.height, args.frame_step)
+    print(f"Captured {frames} frames to {args.output}")
+
+if __name__ == "__main__":
+    main()
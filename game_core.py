@@ -219,9 +219,10 @@ def update_level():
 
 def restart_game():
     """Restart the game"""
-    global game_state, airplane, rings, obstacles, enemies, bullets, powerups
-    
-    game_state = {
+    # Update the shared dicts and lists in place: the other modules imported
+    # them by name, so rebinding the globals here would leave them stale
+    game_state.clear()
+    game_state.update({
         'score': 0,
         'lives': 3,
         'speed': 1.0,
@@ -232,25 +233,27 @@ def restart_game():
         'enemy_collision_count': 0,
         'cheat_mode': False,
         'cheat_fire_timer': 0
-    }
+    })
     
-    airplane = {
+    airplane.clear()
+    airplane.update({
         'x': 0, 'y': 0, 'z': 50,
         'roll': 0, 'pitch': 0, 'yaw': 0,
         'velocity': 1.0,
         'horizontal_velocity': 0.0,
         'vertical_velocity': 0.0,
         'propeller_angle': 0
-    }
+    })
     
-    rings = []
-    obstacles = []
-    enemies = []
-    bullets = []
-    powerups = []
+    rings[:] = []
+    obstacles[:] = []
+    enemies[:] = []
+    bullets[:] = []
+    powerups[:] = []
+    explosions[:] = []
     
-    # This will need to call init_game_objects from game_objects module
-    # init_game_objects()
+    from game_objects import init_game_objects
+    init_game_objects()
 
 # Input handling functions
 def keyboardListener(key, x, y):
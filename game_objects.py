@@ -7,7 +7,8 @@ import random
 # Import from core module
 from game_core import (
     game_state, airplane, rings, obstacles, enemies, bullets, powerups, explosions,
-    RECYCLE_DISTANCE_BEHIND, SPAWN_DISTANCE_AHEAD, handle_crash
+    RECYCLE_DISTANCE_BEHIND, SPAWN_DISTANCE_AHEAD, handle_crash,
+    update_airplane, update_level
 )
 
 def recycle_objects():
@@ -306,4 +307,18 @@ def check_collisions():
             # Bonus score for collecting powerup
             game_state['score'] += 200
             
-            print("BOOST POWERUP COLLECTED! 7 seconds of invulnerability and super speed!")  # Console feedback
\ No newline at end of file
+            print("BOOST POWERUP COLLECTED! 7 seconds of invulnerability and super speed!")  # Console feedback
+
+def update_game():
+    """Advance the simulation by one tick (one frame at 60 FPS)"""
+    if game_state['game_over']:
+        return
+
+    game_state['time'] += 1
+    update_airplane()
+    recycle_objects()
+    update_enemies()
+    update_bullets()
+    update_explosions()
+    check_collisions()
+    update_level()
@@ -16,6 +16,9 @@ from game_objects import (
     update_bullets, update_explosions, check_collisions, fire_bullet
 )
 
+# Quadric shared by every ring (created once, not per frame)
+ring_quadric = None
+
 def draw_airplane():
     """Draw the airplane model using basic shapes"""
     glPushMatrix()
@@ -76,8 +79,11 @@ def draw_airplane():
 
 def draw_ring(ring):
     """Draw a ring to fly through"""
+    global ring_quadric
     if ring['collected']:
         return
+    if ring_quadric is None:
+        ring_quadric = gluNewQuadric()
     
     glPushMatrix()
     glTranslatef(ring['x'], ring['y'], ring['z'])
@@ -85,7 +91,10 @@ def draw_ring(ring):
     
     # Outer ring
     glColor3f(1, 1, 0)
-    gluCylinder(gluNewQuadric(), 80, 80, 20, 20, 5)
+    gluCylinder(ring_quadric, 80, 80, 20, 20, 5)
     
     # Inner hole (visual representation)
-    glColor3f(0.5,
\ No newline at end of file
+    glColor3f(0.5, 0.5, 0)
+    gluCylinder(ring_quadric, 70, 70, 20, 20, 5)
+    
+    glPopMatrix()
@@ -0,0 +1,114 @@
+import ctypes
+import os
+import sys
+
+# PyOpenGL picks its platform on the first OpenGL import, so this module must
+# be imported before any module that does `from OpenGL.GL import *`. Without a
+# display on Linux, default to EGL so a context can be created with no X server.
+# Mesa's EGL still looks for a window system unless told to run surfaceless.
+if (sys.platform.startswith('linux') and
+        not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY')):
+    os.environ.setdefault('PYOPENGL_PLATFORM', 'egl')
+    if os.environ['PYOPENGL_PLATFORM'] == 'egl':
+        os.environ.setdefault('EGL_PLATFORM', 'surfaceless')
+
+# Offscreen context state; GLUT shapes (glutSolidCube, ...) only work with a GLUT window
+headless_context = {
+    'backend': None,                  # 'glut', 'egl' or 'osmesa'
+    'glut_available': False,
+    'handles': None                   # Keeps EGL/OSMesa objects and buffers alive
+}
+
+def is_null(handle):
+    """True for a NULL EGL/OSMesa handle, whether PyOpenGL returns it as int or ctypes"""
+    return not handle or not getattr(handle, 'value', handle)
+
+def init_egl_context(width, height):
+    """Create an EGL pbuffer context; needs no windowing system"""
+    from OpenGL import EGL
+    from OpenGL import arrays
+    from OpenGL.error import GLError
+
+    try:
+        display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = ctypes.c_long(), ctypes.c_long()
+        if is_null(display) or not EGL.eglInitialize(display, major, minor):
+            raise RuntimeError("Could not initialize EGL (EGL_PLATFORM=%s)" %
+                               os.environ.get('EGL_PLATFORM', 'default'))
+
+        config_attributes = arrays.GLintArray.asArray([
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8,
+            EGL.EGL_DEPTH_SIZE, 24,
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE
+        ])
+        configs = (EGL.EGLConfig * 1)()
+        num_configs = ctypes.c_long()
+        if not EGL.eglChooseConfig(display, config_attributes, configs, 1, num_configs) or not num_configs.value:
+            raise RuntimeError("No EGL config supports desktop OpenGL with a pbuffer")
+
+        surface_attributes = arrays.GLintArray.asArray([
+            EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height, EGL.EGL_NONE
+        ])
+        surface = EGL.eglCreatePbufferSurface(display, configs[0], surface_attributes)
+        if is_null(surface):
+            raise RuntimeError("Could not create a %dx%d EGL pbuffer surface" % (width, height))
+
+        # Fixed-function drawing needs desktop OpenGL (compatibility profile), not GLES
+        if not EGL.eglBindAPI(EGL.EGL_OPENGL_API):
+            raise RuntimeError("EGL does not support desktop OpenGL")
+        context = EGL.eglCreateContext(display, configs[0], EGL.EGL_NO_CONTEXT, None)
+        if is_null(context):
+            raise RuntimeError("Could not create an EGL OpenGL context")
+        if not EGL.eglMakeCurrent(display, surface, surface, context):
+            raise RuntimeError("Could not make the EGL context current")
+    except GLError as error:
+        # PyOpenGL's own error checking raises before the return value is seen
+        raise RuntimeError("EGL setup failed: %s" % error) from error
+    return display, surface, context
+
+def init_osmesa_context(width, height):
+    """Create a software OSMesa context rendering into a host buffer"""
+    from OpenGL import osmesa
+    from OpenGL import arrays
+    from OpenGL.GL import GL_UNSIGNED_BYTE
+
+    context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+    if is_null(context):
+        raise RuntimeError("Could not create an OSMesa context")
+    buffer = arrays.GLubyteArray.zeros((height, width, 4))
+    if not osmesa.OSMesaMakeCurrent(context, buffer, GL_UNSIGNED_BYTE, width, height):
+        raise RuntimeError("Could not make the OSMesa context current")
+    return context, buffer
+
+def init_glut_context(width, height):
+    """Create a hidden GLUT window; needs a display"""
+    from OpenGL.GLUT import (
+        glutInit, glutInitDisplayMode, glutInitWindowSize, glutCreateWindow,
+        glutHideWindow, GLUT_RGB, GLUT_DEPTH
+    )
+    glutInit()
+    glutInitDisplayMode(GLUT_RGB | GLUT_DEPTH)
+    glutInitWindowSize(width, height)
+    glutCreateWindow(b"3D Aviator Capture")
+    glutHideWindow()
+
+def init_headless_context(width, height):
+    """Create a GL context for offscreen rendering without showing a window
+
+    Uses the platform PyOpenGL was loaded with: EGL or OSMesa when
+    PYOPENGL_PLATFORM is 'egl' or 'osmesa' (EGL is chosen automatically on
+    Linux without a display), otherwise a hidden GLUT window.
+    """
+    platform = os.environ.get('PYOPENGL_PLATFORM')
+    if platform == 'egl':
+        headless_context['handles'] = init_egl_context(width, height)
+        headless_context['backend'] = 'egl'
+    elif platform == 'osmesa':
+        headless_context['handles'] = init_osmesa_context(width, height)
+        headless_context['backend'] = 'osmesa'
+    else:
+        init_glut_context(width, height)
+        headless_context['backend'] = 'glut'
+        headless_context['glut_available'] = True
@@ -0,0 +1,290 @@
+import headless  # Must come before the OpenGL imports, it picks the PyOpenGL platform
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Import from other modules
+from game_core import game_state, airplane, keyboardListener, restart_game
+from game_objects import (
+    rings, obstacles, enemies, bullets, powerups, explosions, update_game
+)
+
+# Soak parameters
+TICKS_PER_SECOND = 60
+SOAK_HOURS = 4                        # Simulated hours
+SAMPLE_MINUTES = 5                    # Simulated minutes between samples
+TRACEMALLOC_TOP = 5                   # Allocation sites reported per sample
+TRACEMALLOC_FRAMES = 1
+# Only allocations made by the game count, not the harness's own samples
+GAME_MODULES = ['game_core.py', 'game_objects.py', 'terrain.py', 'graphics_main.py']
+
+# Drift detection
+GROWTH_WINDOW = 6                     # Trailing samples that must never decrease
+RSS_GROWTH_TOLERANCE = 0.05           # Relative RSS growth over the window that counts as a leak
+RSS_GROWTH_MIN_BYTES = 8 * 1024 * 1024  # Ignore allocator noise smaller than this
+TICK_DRIFT_RATIO = 1.5                # Allowed slowdown of p95 tick time vs. the first sample
+FLOAT32_PRECISION_LIMIT = 2 ** 17     # Beyond this, float32 positions step in 1/64 units
+
+# Autopilot input, so the simulation exercises steering, shooting and level-ups
+AUTOPILOT_KEYS = [b'w', b's', b'a', b'd', b'q', b'e', b' ']
+AUTOPILOT_INTERVAL = 10               # Ticks between key presses
+
+def current_rss():
+    """Return the resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is None:
+        return 0
+    # Peak rather than current RSS; still rises monotonically with a leak
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(int(fraction * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+def entity_counts():
+    """Lengths of every list the game grows or recycles"""
+    return {
+        'rings': len(rings),
+        'obstacles': len(obstacles),
+        'enemies': len(enemies),
+        'bullets': len(bullets),
+        'powerups': len(powerups),
+        'explosions': len(explosions)
+    }
+
+def game_snapshot():
+    """Take a tracemalloc snapshot restricted to allocations made in the game modules"""
+    filters = [tracemalloc.Filter(True, os.path.join('*', name)) for name in GAME_MODULES]
+    return tracemalloc.take_snapshot().filter_traces(filters)
+
+def top_allocators(snapshot, baseline):
+    """Allocation sites that grew the most since the baseline snapshot"""
+    stats = snapshot.compare_to(baseline, 'lineno')[:TRACEMALLOC_TOP]
+    return [{
+        'site': str(stat.traceback),
+        'size': stat.size,
+        'size_diff': stat.size_diff,
+        'count_diff': stat.count_diff
+    } for stat in stats]
+
+def take_sample(tick, tick_times, baseline):
+    """Collect one sample of memory, entity and timing metrics"""
+    tick_times.sort()
+    snapshot = game_snapshot()
+    return {
+        'tick': tick,
+        'sim_minutes': tick / TICKS_PER_SECOND / 60,
+        'rss': current_rss(),
+        'traced': sum(stat.size for stat in snapshot.statistics('filename')),
+        'entities': entity_counts(),
+        'airplane_y': airplane['y'],
+        'level': game_state['level'],
+        'tick_p50': percentile(tick_times, 0.50),
+        'tick_p95': percentile(tick_times, 0.95),
+        'tick_p99': percentile(tick_times, 0.99),
+        'top_allocators': top_allocators(snapshot, baseline)
+    }
+
+def is_monotonic_growth(values, tolerance=0.0, min_growth=0):
+    """True when the trailing window never decreases and grows by more than tolerance"""
+    if len(values) < GROWTH_WINDOW:
+        return False
+    window = values[-GROWTH_WINDOW:]
+    if any(later < earlier for earlier, later in zip(window, window[1:])):
+        return False
+    return window[-1] > window[0] * (1 + tolerance) and window[-1] - window[0] > min_growth
+
+def find_problems(samples):
+    """Flag metrics that keep growing or drifting across the samples, keyed by metric"""
+    problems = {}
+
+    if is_monotonic_growth([s['rss'] for s in samples], RSS_GROWTH_TOLERANCE, RSS_GROWTH_MIN_BYTES):
+        problems['rss'] = ("RSS grew monotonically over the last %d samples (%d -> %d bytes)" %
+                           (GROWTH_WINDOW, samples[-GROWTH_WINDOW]['rss'], samples[-1]['rss']))
+
+    if is_monotonic_growth([s['traced'] for s in samples], RSS_GROWTH_TOLERANCE):
+        problems['traced'] = ("Python heap grew monotonically over the last %d samples (%d -> %d bytes)" %
+                              (GROWTH_WINDOW, samples[-GROWTH_WINDOW]['traced'], samples[-1]['traced']))
+
+    for name in samples[-1]['entities']:
+        counts = [s['entities'][name] for s in samples]
+        if is_monotonic_growth(counts):
+            problems[name] = ("'%s' list grew monotonically over the last %d samples (%d -> %d)" %
+                              (name, GROWTH_WINDOW, counts[-GROWTH_WINDOW], counts[-1]))
+
+    if len(samples) > 1 and samples[0]['tick_p95'] > 0:
+        ratio = samples[-1]['tick_p95'] / samples[0]['tick_p95']
+        if ratio > TICK_DRIFT_RATIO:
+            problems['tick_p95'] = ("p95 tick time drifted %.2fx (%.3f ms -> %.3f ms)" %
+                                    (ratio, samples[0]['tick_p95'] * 1000, samples[-1]['tick_p95'] * 1000))
+
+    if abs(samples[-1]['airplane_y']) > FLOAT32_PRECISION_LIMIT:
+        problems['airplane_y'] = ("airplane y = %.0f is past float32 precision for rendering" %
+                                  samples[-1]['airplane_y'])
+
+    return problems
+
+def autopilot(tick, rng):
+    """Press a random flight key every few ticks and keep the game from ending"""
+    if tick % AUTOPILOT_INTERVAL == 0:
+        keyboardListener(rng.choice(AUTOPILOT_KEYS), 0, 0)
+    # A game over would freeze the simulation, so lives never run out
+    game_state['lives'] = max(game_state['lives'], 3)
+
+def print_sample(sample, out):
+    """Print a one-line summary of a sample"""
+    counts = ' '.join('%s=%d' % item for item in sorted(sample['entities'].items()))
+    print("[%7.1f min] rss=%.1fMB heap=%.1fKB p50=%.3fms p95=%.3fms p99=%.3fms level=%d %s" % (
+        sample['sim_minutes'], sample['rss'] / 1e6, sample['traced'] / 1e3,
+        sample['tick_p50'] * 1000, sample['tick_p95'] * 1000, sample['tick_p99'] * 1000,
+        sample['level'], counts), file=out)
+
+def run_soak(hours=SOAK_HOURS, sample_minutes=SAMPLE_MINUTES, seed=0, render=False,
+             width=None, height=None, verbose=True, fail_fast=False, max_wall_minutes=None):
+    """Run the simulation for hours of simulated time
+
+    Returns (samples, problems, timed_out). Stops early at the first problem
+    when fail_fast is set, or once max_wall_minutes of real time have passed,
+    in which case timed_out is True.
+    """
+    random.seed(seed)
+    rng = random.Random(seed)
+
+    target = None
+    if render:
+        from capture import CAPTURE_WIDTH, CAPTURE_HEIGHT, OffscreenTarget, draw_capture_scene
+        from headless import init_headless_context
+        from terrain import init_terrain, update_terrain
+        width = width or CAPTURE_WIDTH
+        height = height or CAPTURE_HEIGHT
+        init_headless_context(width, height)
+        target = OffscreenTarget(width, height)
+
+    # Also clears state left over from an earlier run in the same process
+    restart_game()
+    if render:
+        init_terrain()
+
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+    baseline = game_snapshot()
+
+    total_ticks = int(hours * 3600 * TICKS_PER_SECOND)
+    sample_ticks = max(int(sample_minutes * 60 * TICKS_PER_SECOND), 1)
+    samples = []
+    problems = {}
+    tick_times = []
+
+    # The game prints on every shot and kill; keep that out of the report
+    out = sys.stdout
+    timed_out = False
+    deadline = None
+    if max_wall_minutes is not None:
+        deadline = time.perf_counter() + max_wall_minutes * 60
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        try:
+            for tick in range(1, total_ticks + 1):
+                autopilot(tick, rng)
+
+                start = time.perf_counter()
+                update_game()
+                if render:
+                    update_terrain()
+                    target.bind()
+                    draw_capture_scene()
+                    target.read()
+                now = time.perf_counter()
+                tick_times.append(now - start)
+
+                if deadline is not None and now > deadline:
+                    timed_out = True
+                    print("Wall-clock limit reached after %.1f simulated minutes" %
+                          (tick / TICKS_PER_SECOND / 60), file=out)
+                    break
+
+                if tick % sample_ticks == 0:
+                    sample = take_sample(tick, tick_times, baseline)
+                    samples.append(sample)
+                    tick_times = []
+                    if verbose:
+                        print_sample(sample, out)
+
+                    # Report each metric once, when it first shows up
+                    for metric, problem in find_problems(samples).items():
+                        if metric not in problems and verbose:
+                            print("WARNING: " + problem, file=out)
+                        problems[metric] = problem
+                    if fail_fast and problems:
+                        break
+        finally:
+            tracemalloc.stop()
+            if target is not None:
+                target.release()
+
+    return samples, list(problems.values()), timed_out
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak-test the 3D Aviator simulation for leaks and drift")
+    parser.add_argument('--hours', type=float, default=SOAK_HOURS, help="Simulated hours to run")
+    parser.add_argument('--sample-minutes', type=float, default=SAMPLE_MINUTES,
+                        help="Simulated minutes between samples")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--render', action='store_true', help="Also render every tick offscreen")
+    parser.add_argument('--json', help="Write all samples and problems to this file")
+    parser.add_argument('--fail-fast', action='store_true', help="Stop at the first problem found")
+    parser.add_argument('--max-wall-minutes', type=float,
+                        help="Stop after this many minutes of real time")
+    args = parser.parse_args()
+
+    if args.sample_minutes <= 0:
+        parser.error("--sample-minutes must be positive")
+    # Growth detection needs a full window of samples
+    if args.hours * 60 < GROWTH_WINDOW * args.sample_minutes:
+        parser.error("--hours must cover at least %d samples (%.2f h at --sample-minutes %g)" %
+                     (GROWTH_WINDOW, GROWTH_WINDOW * args.sample_minutes / 60, args.sample_minutes))
+
+    samples, problems, timed_out = run_soak(args.hours, args.sample_minutes, args.seed, args.render,
+                                            fail_fast=args.fail_fast,
+                                            max_wall_minutes=args.max_wall_minutes)
+    inconclusive = not problems and len(samples) < GROWTH_WINDOW
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'samples': samples, 'problems': problems, 'timed_out': timed_out,
+                       'inconclusive': inconclusive}, f, indent=2)
+
+    if problems:
+        print("Soak test found %d problem(s):" % len(problems))
+        for problem in problems:
+            print("  - " + problem)
+        sys.exit(1)
+    if inconclusive:
+        print("Soak test inconclusive: only %d sample(s) taken, growth detection needs %d%s" %
+              (len(samples), GROWTH_WINDOW, " (stopped at the wall-clock limit)" if timed_out else ""))
+        sys.exit(3)
+    if timed_out:
+        print("Soak test passed: no growth or drift detected in %d samples before the wall-clock limit" %
+              len(samples))
+    else:
+        print("Soak test passed: no growth or drift detected")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+from OpenGL.GL import *
+from OpenGL.GLUT import *
+from OpenGL.GLU import *
+import math
+import random
+
+# Import from core module
+from game_core import airplane, GRID_SIZE, GRID_LINES
+
+# Terrain tile parameters
+TILE_LENGTH = GRID_SIZE // 2          # Depth of one tile along +Y
+TILE_COUNT = 4                        # Tiles drawn around the airplane
+TILES_BEHIND = 1                      # How many of them stay behind the airplane
+TILE_RESOLUTION = GRID_LINES          # Height samples per tile edge (lines up with the grid)
+TILE_BANDS = 8                        # Display lists per tile, compiled one per frame
+ROWS_PER_BAND = TILE_RESOLUTION // TILE_BANDS
+GRID_SPACING = GRID_SIZE / GRID_LINES
+
+# Height-mapped terrain (flat green plane when disabled)
+TERRAIN_HEIGHT_MAPPED = False
+TERRAIN_MAX_HEIGHT = 15               # Stays below the airplane's ground limit (z = 20)
+TERRAIN_SEED = 1234
+
+# Active tiles, each {'index': tile number along +Y, 'lists': display list ids per band,
+#                     'heights': samples, 'compiled': bands already compiled}
+# One more tile than is drawn is kept as a spare just ahead of the strip, so a
+# height-mapped tile is compiled over several frames before it comes into view.
+terrain_tiles = []
+
+# Display lists shared by every tile when the ground is flat
+flat_tile_lists = None
+
+def tile_index_for(y):
+    """Return the tile number that contains world position y"""
+    return int(math.floor(y / TILE_LENGTH))
+
+def first_visible_index():
+    """Return the tile number of the first tile drawn behind the airplane"""
+    return tile_index_for(airplane['y']) - TILES_BEHIND
+
+def generate_heights(index):
+    """Generate the height map for one tile, same result every time for the same index"""
+    rng = random.Random(TERRAIN_SEED + index)
+    phase_x = rng.uniform(0, 2 * math.pi)
+    phase_y = rng.uniform(0, 2 * math.pi)
+
+    heights = []
+    for row in range(TILE_RESOLUTION + 1):
+        # World Y keeps neighbouring tiles continuous at their shared edge
+        world_y = index * TILE_LENGTH + row * TILE_LENGTH / TILE_RESOLUTION
+        row_heights = []
+        for col in range(TILE_RESOLUTION + 1):
+            world_x = -GRID_SIZE / 2 + col * GRID_SIZE / TILE_RESOLUTION
+            h = (math.sin(world_x * 0.004 + TERRAIN_SEED) +
+                 math.sin(world_y * 0.003) +
+                 0.5 * math.sin((world_x + world_y) * 0.01))
+            # Small per-tile variation that fades out at the tile edges
+            edge = math.sin(math.pi * row / TILE_RESOLUTION)
+            h += 0.3 * edge * math.sin(world_x * 0.02 + phase_x) * math.cos(world_y * 0.02 + phase_y)
+            row_heights.append((h + 2.8) / 5.6 * TERRAIN_MAX_HEIGHT)
+        heights.append(row_heights)
+    return heights
+
+def build_band_geometry(heights, band):
+    """Emit one band of a tile's ground and grid lines in tile-local coordinates"""
+    half = GRID_SIZE / 2
+    step_x = GRID_SIZE / TILE_RESOLUTION
+    step_y = TILE_LENGTH / TILE_RESOLUTION
+    row_start = band * ROWS_PER_BAND
+    row_end = row_start + ROWS_PER_BAND
+
+    def height_at(row, col):
+        return heights[row][col] if heights else 0
+
+    # Ground surface
+    glColor3f(0.2, 0.6, 0.2)
+    for row in range(row_start, row_end):
+        glBegin(GL_QUAD_STRIP)
+        for col in range(TILE_RESOLUTION + 1):
+            x = -half + col * step_x
+            glVertex3f(x, row * step_y, height_at(row, col))
+            glVertex3f(x, (row + 1) * step_y, height_at(row + 1, col))
+        glEnd()
+
+    # Grid lines, lifted slightly to avoid z-fighting with the ground
+    glColor3f(0.3, 0.7, 0.3)
+    glBegin(GL_LINES)
+    for i in range(GRID_LINES + 1):
+        x = -half + i * GRID_SPACING
+        col = i * TILE_RESOLUTION // GRID_LINES
+        for row in range(row_start, row_end):
+            glVertex3f(x, row * step_y, height_at(row, col) + 0.5)
+            glVertex3f(x, (row + 1) * step_y, height_at(row + 1, col) + 0.5)
+    for i in range(int(TILE_LENGTH / GRID_SPACING)):
+        y = i * GRID_SPACING
+        row = int(round(y / step_y))
+        if not row_start <= row < row_end:
+            continue
+        for col in range(TILE_RESOLUTION):
+            glVertex3f(-half + col * step_x, y, height_at(row, col) + 0.5)
+            glVertex3f(-half + (col + 1) * step_x, y, height_at(row, col + 1) + 0.5)
+    glEnd()
+
+def compile_band(lists, heights, band):
+    """(Re)build the cached display list for one band of a tile"""
+    glNewList(lists[band], GL_COMPILE)
+    build_band_geometry(heights, band)
+    glEndList()
+
+def make_tile(index):
+    """Create a tile; height-mapped tiles get their heights now and their lists on draw"""
+    tile = {'index': index, 'lists': None, 'heights': None, 'compiled': TILE_BANDS}
+    if TERRAIN_HEIGHT_MAPPED:
+        tile['heights'] = generate_heights(index)
+        tile['compiled'] = 0
+    return tile
+
+def init_terrain():
+    """Create the terrain tiles around the airplane (needs a current GL context)"""
+    global flat_tile_lists
+
+    release_terrain()
+
+    if not TERRAIN_HEIGHT_MAPPED:
+        # Flat ground is identical on every tile, so one set of lists serves them all
+        base = glGenLists(TILE_BANDS)
+        flat_tile_lists = [base + band for band in range(TILE_BANDS)]
+        for band in range(TILE_BANDS):
+            compile_band(flat_tile_lists, None, band)
+
+    first = first_visible_index()
+    for i in range(TILE_COUNT + 1):
+        terrain_tiles.append(make_tile(first + i))
+
+def release_terrain():
+    """Delete all cached terrain display lists"""
+    global flat_tile_lists
+
+    for tile in terrain_tiles:
+        if tile['lists'] is not None:
+            glDeleteLists(tile['lists'][0], TILE_BANDS)
+    terrain_tiles[:] = []
+
+    if flat_tile_lists is not None:
+        glDeleteLists(flat_tile_lists[0], TILE_BANDS)
+        flat_tile_lists = None
+
+def update_terrain():
+    """Recycle tiles that fell behind the airplane to the front of the strip"""
+    if not terrain_tiles:
+        return
+
+    first = first_visible_index()
+    wanted = set(range(first, first + TILE_COUNT + 1))
+    present = set(tile['index'] for tile in terrain_tiles)
+    free_indices = sorted(wanted - present)
+
+    for tile in terrain_tiles:
+        if tile['index'] in wanted or not free_indices:
+            continue
+        # Move the tile to an empty slot; its lists are rebuilt over the next frames
+        tile['index'] = free_indices.pop(0)
+        if TERRAIN_HEIGHT_MAPPED:
+            tile['heights'] = generate_heights(tile['index'])
+            tile['compiled'] = 0
+
+def draw_terrain():
+    """Draw the cached terrain tiles, compiling at most one band of the spare tile"""
+    visible_end = first_visible_index() + TILE_COUNT
+    budget = 1
+
+    for tile in terrain_tiles:
+        if tile['compiled'] < TILE_BANDS:
+            if tile['lists'] is None:
+                base = glGenLists(TILE_BANDS)
+                tile['lists'] = [base + band for band in range(TILE_BANDS)]
+            if tile['index'] < visible_end:
+                # Already in view (start-up, or a jump back after a crash), so it can't wait
+                bands = TILE_BANDS - tile['compiled']
+            else:
+                bands = budget
+                budget = 0
+            for band in range(tile['compiled'], tile['compiled'] + bands):
+                compile_band(tile['lists'], tile['heights'], band)
+            tile['compiled'] += bands
+
+        if tile['index'] >= visible_end:
+            continue
+
+        glPushMatrix()
+        glTranslatef(0, tile['index'] * TILE_LENGTH, 0)
+        for display_list in (tile['lists'] if TERRAIN_HEIGHT_MAPPED else flat_tile_lists):
+            glCallList(display_list)
+        glPopMatrix()